@@ -1,6 +1,8 @@
+import asyncio
+import atexit
 import logging
+import os
 from datetime import datetime
-import time
 from pathlib import Path
 
 class DroneController:
@@ -18,21 +20,32 @@ class DroneController:
         self.image_save_path = Path("data/drone_images")
         self.image_save_path.mkdir(parents=True, exist_ok=True)
         
-    def connect(self):
+        # Capture filenames: one timestamp per session plus a frame counter
+        self._session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self._frame_no = 0
+        
+        # Keep the image directory open so captures are created relative to it
+        self._image_save_dir = str(self.image_save_path)
+        self._dir_fd = None
+        if os.open in os.supports_dir_fd and hasattr(os, "O_DIRECTORY"):
+            self._dir_fd = os.open(self._image_save_dir, os.O_RDONLY | os.O_DIRECTORY)
+            atexit.register(self.close)
+        
+    async def connect(self):
         """Simulate connecting to the drone"""
         try:
             self.logger.info("Connecting to drone...")
-            time.sleep(1)  # Simulate connection time
+            await asyncio.sleep(1)  # Simulate connection time
             self.status["mission_status"] = "connected"
             return True
         except Exception as e:
-            self.logger.error(f"Failed to connect to drone: {str(e)}")
+            self.logger.error("Failed to connect to drone: %s", e)
             return False
     
-    def start_mission(self):
+    async def start_mission(self):
         """Start automated field surveillance mission"""
         try:
-            if not self.connect():
+            if not await self.connect():
                 raise ConnectionError("Could not connect to drone")
                 
             self.logger.info("Starting surveillance mission...")
@@ -40,16 +53,16 @@ class DroneController:
             self.status["mission_status"] = "in_progress"
             
             # Simulate mission execution
-            self._execute_mission_steps()
+            await self._execute_mission_steps()
             
             return True
             
         except Exception as e:
-            self.logger.error(f"Mission failed: {str(e)}")
-            self.return_to_home()
+            self.logger.error("Mission failed: %s", e)
+            await self.return_to_home()
             return False
     
-    def _execute_mission_steps(self):
+    async def _execute_mission_steps(self):
         """Execute the steps of the surveillance mission"""
         # These are simulated steps
         mission_steps = [
@@ -62,9 +75,9 @@ class DroneController:
         ]
         
         for step in mission_steps:
-            self.logger.info(f"Mission step: {step}")
+            self.logger.info("Mission step: %s", step)
             self.status["mission_status"] = step
-            time.sleep(0.5)  # Simulate step execution time
+            await asyncio.sleep(0.5)  # Simulate step execution time
             
             # Simulate battery drainage
             self.status["battery"] -= 5
@@ -75,30 +88,36 @@ class DroneController:
     def capture_image(self):
         """Capture an aerial image"""
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            image_path = self.image_save_path / f"aerial_{timestamp}.jpg"
+            image_name = f"aerial_{self._session_id}_{self._frame_no:08d}.jpg"
+            image_path = os.path.join(self._image_save_dir, image_name)
+            self._frame_no += 1
             
             # Simulate image capture
-            self.logger.info(f"Capturing image: {image_path}")
+            self.logger.info("Capturing image: %s", image_path)
             
             # In a real implementation, this would interact with the drone's camera
+            # (ideally streaming to a cv2.VideoWriter opened once per mission).
             # For now, we'll just create an empty file
-            image_path.touch()
+            if self._dir_fd is not None:
+                fd = os.open(image_name, os.O_CREAT | os.O_WRONLY | os.O_TRUNC, 0o644, dir_fd=self._dir_fd)
+            else:
+                fd = os.open(image_path, os.O_CREAT | os.O_WRONLY | os.O_TRUNC, 0o644)
+            os.close(fd)
             
-            return str(image_path)
+            return image_path
             
         except Exception as e:
-            self.logger.error(f"Failed to capture image: {str(e)}")
+            self.logger.error("Failed to capture image: %s", e)
             return None
     
-    def return_to_home(self):
+    async def return_to_home(self):
         """Command drone to return to launch point"""
         self.logger.info("Initiating return to home...")
         self.status["mission_status"] = "returning_home"
         self.status["is_flying"] = False
         
         # Simulate return journey
-        time.sleep(1)
+        await asyncio.sleep(1)
         
         self.status["latitude"], self.status["longitude"] = self.home_coordinates
         self.status["mission_status"] = "landed"
@@ -112,14 +131,21 @@ class DroneController:
         """Get current battery level"""
         return self.status["battery"]
     
-    def emergency_stop(self):
+    def close(self):
+        """Release the image directory handle"""
+        if self._dir_fd is not None:
+            os.close(self._dir_fd)
+            self._dir_fd = None
+        atexit.unregister(self.close)
+    
+    async def emergency_stop(self):
         """Execute emergency landing procedure"""
         self.logger.warning("EMERGENCY STOP INITIATED!")
         self.status["mission_status"] = "emergency_landing"
-        self.return_to_home()
+        await self.return_to_home()
 
 if __name__ == "__main__":
     # Test drone controller
     drone = DroneController()
-    drone.start_mission()
+    asyncio.run(drone.start_mission())
     print("Drone Status:", drone.get_status())
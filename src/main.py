@@ -1,6 +1,9 @@
 import cv2
 import numpy as np
 from datetime import datetime
+import asyncio
+import functools
+import hashlib
 import logging
 from pathlib import Path
 
@@ -24,27 +27,19 @@ class AgriculturalRobot:
         self.is_monitoring = False
         self.emergency_stop = False
         
+        # Disease detection results memoized by image content hash
+        self._detect_disease_cached = functools.lru_cache(maxsize=128)(self._detect_disease_by_hash)
+        
     def start_monitoring(self):
         """Start the monitoring process"""
         self.logger.info("Starting monitoring sequence...")
         self.is_monitoring = True
         
         try:
-            # Start drone surveillance
-            self.drone.start_mission()
-            
-            # Analyze soil conditions
-            soil_data = self.soil_analyzer.analyze_soil()
-            self.logger.info(f"Soil Analysis Results: {soil_data}")
-            
-            # Check for plant diseases
-            image_path = "data/latest_capture.jpg"
-            if Path(image_path).exists():
-                disease_result = self.disease_classifier.detect_disease(image_path)
-                self.logger.info(f"Disease Detection Results: {disease_result}")
+            asyncio.run(self._run_monitoring_tasks())
             
         except Exception as e:
-            self.logger.error(f"Error during monitoring: {str(e)}")
+            self.logger.error("Error during monitoring: %s", e)
             self.emergency_stop = True
         
         finally:
@@ -52,10 +47,33 @@ class AgriculturalRobot:
             if self.emergency_stop:
                 self.emergency_shutdown()
     
+    async def _run_monitoring_tasks(self):
+        """Run drone surveillance, soil analysis and disease checks concurrently"""
+        # Blocking sensor and inference work runs in worker threads
+        # while the drone mission awaits its own steps
+        _, soil_data, _ = await asyncio.gather(
+            self.drone.start_mission(),
+            asyncio.to_thread(self.soil_analyzer.analyze_soil),
+            asyncio.to_thread(self._check_latest_capture)
+        )
+        self.logger.info("Soil Analysis Results: %s", soil_data)
+    
+    def _check_latest_capture(self):
+        """Check the latest captured image for plant diseases"""
+        image_path = "data/latest_capture.jpg"
+        if Path(image_path).exists():
+            image_hash = hashlib.blake2b(Path(image_path).read_bytes(), digest_size=16).digest()
+            disease_result = self._detect_disease_cached(image_hash, image_path)
+            self.logger.info("Disease Detection Results: %s", disease_result)
+    
+    def _detect_disease_by_hash(self, image_hash, image_path):
+        """Run disease detection; memoized on (image_hash, image_path)"""
+        return self.disease_classifier.detect_disease(image_path)
+    
     def emergency_shutdown(self):
         """Handle emergency shutdown procedure"""
         self.logger.warning("Emergency shutdown initiated!")
-        self.drone.return_to_home()
+        asyncio.run(self.drone.return_to_home())
         self.is_monitoring = False
         self.emergency_stop = True
     
@@ -79,20 +97,17 @@ def main():
         
         # Generate and display report
         report = robot.generate_report()
-        print("
-Monitoring Report:")
+        print("\nMonitoring Report:")
         print("="*50)
         for key, value in report.items():
             print(f"{key}: {value}")
             
     except KeyboardInterrupt:
-        print("
-Program terminated by user")
+        print("\nProgram terminated by user")
         robot.emergency_shutdown()
     
     except Exception as e:
-        print(f"
-An error occurred: {str(e)}")
+        print(f"\nAn error occurred: {str(e)}")
         robot.emergency_shutdown()
 
 if __name__ == "__main__":
@@ -1,8 +1,42 @@
 import logging
-from datetime import datetime
+import atexit
+import itertools
+import mmap
+from datetime import datetime, timedelta
+import os
 import random
-import json
+import time
 from pathlib import Path
+import numpy as np
+import orjson
+
+# Condition labels, indexed by the np.select choices in _analyze_reading
+_CONDITIONS = ("low", "high", "optimal", "suboptimal")
+
+# Lower bound on the size of one serialized reading, used to presize columns
+_MIN_READING_BYTES = 64
+
+# Recommended actions keyed by (parameter, condition)
+_REC_TABLE = {
+    ("moisture", "low"): "Increase irrigation frequency",
+    ("moisture", "high"): "Reduce irrigation and improve drainage",
+    ("moisture", "suboptimal"): "Adjust irrigation schedule",
+    ("ph", "low"): "Apply lime to increase pH",
+    ("ph", "high"): "Apply sulfur to decrease pH",
+    ("ph", "suboptimal"): "Monitor pH levels",
+    ("nitrogen", "low"): "Apply nitrogen-rich fertilizer",
+    ("nitrogen", "high"): "Reduce nitrogen application",
+    ("nitrogen", "suboptimal"): "Adjust nitrogen levels gradually",
+    ("phosphorus", "low"): "Apply phosphate fertilizer",
+    ("phosphorus", "high"): "Reduce phosphorus application",
+    ("phosphorus", "suboptimal"): "Monitor phosphorus levels",
+    ("potassium", "low"): "Apply potassium-rich fertilizer",
+    ("potassium", "high"): "Reduce potassium application",
+    ("potassium", "suboptimal"): "Adjust potassium levels",
+    ("temperature", "low"): "Consider soil warming techniques",
+    ("temperature", "high"): "Apply mulch for temperature regulation",
+    ("temperature", "suboptimal"): "Monitor soil temperature",
+}
 
 class SoilAnalyzer:
     def __init__(self):
@@ -11,6 +45,14 @@ class SoilAnalyzer:
         self.data_path = Path("data/soil_readings")
         self.data_path.mkdir(parents=True, exist_ok=True)
         
+        # Append-only readings log, one JSON object per line
+        self._jsonl_path = self.data_path / "soil_readings.jsonl"
+        self._jsonl = open(self._jsonl_path, 'ab', buffering=1 << 16)
+        self._pending_writes = 0
+        self._terminate_partial_record()
+        self.flush_interval = 10  # readings buffered between flushes
+        atexit.register(self.close)
+        
         # Sensor thresholds
         self.thresholds = {
             "moisture": {"min": 20, "max": 80, "optimal": 50},
@@ -20,6 +62,13 @@ class SoilAnalyzer:
             "potassium": {"min": 0, "max": 100, "optimal": 50},
             "temperature": {"min": 10, "max": 35, "optimal": 25}
         }
+        
+        # Threshold arrays in a fixed parameter order for vectorized analysis
+        self._params = tuple(self.thresholds)
+        self._mins = np.array([self.thresholds[p]["min"] for p in self._params], dtype=np.float64)
+        self._maxes = np.array([self.thresholds[p]["max"] for p in self._params], dtype=np.float64)
+        self._optimals = np.array([self.thresholds[p]["optimal"] for p in self._params], dtype=np.float64)
+        self._tol = (self._maxes - self._mins) * 0.1
     
     def analyze_soil(self):
         """Perform soil analysis using sensors"""
@@ -38,7 +87,7 @@ class SoilAnalyzer:
             return analysis
             
         except Exception as e:
-            self.logger.error(f"Error during soil analysis: {str(e)}")
+            self.logger.error("Error during soil analysis: %s", e)
             return None
     
     def _simulate_sensor_reading(self):
@@ -62,85 +111,47 @@ class SoilAnalyzer:
             "recommendations": []
         }
         
-        # Analyze each parameter
-        for param, value in reading.items():
-            if param == "timestamp":
-                continue
-                
-            thresholds = self.thresholds[param]
-            condition = self._evaluate_condition(value, thresholds)
+        # Evaluate all parameters in a single vectorized pass
+        conditions = self._classify_values([reading[p] for p in self._params])
+        
+        for param, condition in zip(self._params, conditions):
             analysis["conditions"][param] = condition
             
             if condition != "optimal":
-                recommendation = self._generate_recommendation(param, value, condition)
+                recommendation = self._generate_recommendation(param, reading[param], condition)
                 analysis["recommendations"].append(recommendation)
         
         return analysis
     
-    def _evaluate_condition(self, value, thresholds):
-        """Evaluate the condition of a soil parameter"""
-        if value < thresholds["min"]:
-            return "low"
-        elif value > thresholds["max"]:
-            return "high"
-        elif abs(value - thresholds["optimal"]) <= (thresholds["max"] - thresholds["min"]) * 0.1:
-            return "optimal"
-        else:
-            return "suboptimal"
+    def _classify_values(self, values):
+        """Evaluate all soil parameters in a single vectorized pass"""
+        values = np.array(values, dtype=np.float64)
+        low = values < self._mins
+        high = values > self._maxes
+        optimal = np.abs(values - self._optimals) <= self._tol
+        indices = np.select([low, high, optimal], [0, 1, 2], default=3)
+        return tuple(_CONDITIONS[i] for i in indices.tolist())
     
     def _generate_recommendation(self, parameter, value, condition):
         """Generate recommendations based on soil conditions"""
-        recommendations = {
-            "moisture": {
-                "low": "Increase irrigation frequency",
-                "high": "Reduce irrigation and improve drainage",
-                "suboptimal": "Adjust irrigation schedule"
-            },
-            "ph": {
-                "low": "Apply lime to increase pH",
-                "high": "Apply sulfur to decrease pH",
-                "suboptimal": "Monitor pH levels"
-            },
-            "nitrogen": {
-                "low": "Apply nitrogen-rich fertilizer",
-                "high": "Reduce nitrogen application",
-                "suboptimal": "Adjust nitrogen levels gradually"
-            },
-            "phosphorus": {
-                "low": "Apply phosphate fertilizer",
-                "high": "Reduce phosphorus application",
-                "suboptimal": "Monitor phosphorus levels"
-            },
-            "potassium": {
-                "low": "Apply potassium-rich fertilizer",
-                "high": "Reduce potassium application",
-                "suboptimal": "Adjust potassium levels"
-            },
-            "temperature": {
-                "low": "Consider soil warming techniques",
-                "high": "Apply mulch for temperature regulation",
-                "suboptimal": "Monitor soil temperature"
-            }
-        }
-        
         return {
             "parameter": parameter,
             "current_value": value,
             "condition": condition,
-            "action": recommendations[parameter][condition]
+            "action": _REC_TABLE[(parameter, condition)]
         }
     
     def _save_reading(self, reading):
-        """Save soil reading to file"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        file_path = self.data_path / f"soil_reading_{timestamp}.json"
-        
+        """Append soil reading to the readings log"""
         try:
-            with open(file_path, 'w') as f:
-                json.dump(reading, f, indent=4)
-            self.logger.info(f"Soil reading saved to {file_path}")
+            self._jsonl.write(orjson.dumps(reading, option=orjson.OPT_SERIALIZE_NUMPY) + b"\n")
+            self._pending_writes += 1
+            if self._pending_writes >= self.flush_interval:
+                self._jsonl.flush()
+                self._pending_writes = 0
+            self.logger.info("Soil reading saved to %s", self._jsonl_path)
         except Exception as e:
-            self.logger.error(f"Failed to save soil reading: {str(e)}")
+            self.logger.error("Failed to save soil reading: %s", e)
     
     def get_latest_reading(self):
         """Get the most recent soil analysis reading"""
@@ -148,15 +159,115 @@ class SoilAnalyzer:
     
     def get_historical_data(self, days=7):
         """Retrieve historical soil data"""
+        frame = self.get_historical_frame(days)
+        timestamps = frame["timestamp"].tolist()
+        columns = [frame[p].tolist() for p in self._params]
+        return [
+            {"timestamp": ts, **dict(zip(self._params, values))}
+            for ts, *values in zip(timestamps, *columns)
+        ]
+    
+    def get_historical_frame(self, days=7):
+        """
+        Retrieve historical soil data as columns
+        Args:
+            days: Number of days of history to include
+        Returns:
+            Dictionary mapping "timestamp" and each soil parameter to a 1-D array
+        """
         try:
-            data = []
-            for file_path in self.data_path.glob("soil_reading_*.json"):
-                with open(file_path, 'r') as f:
-                    data.append(json.load(f))
-            return data
+            # Make buffered readings visible to the scan below
+            if not self._jsonl.closed:
+                self._jsonl.flush()
+                self._pending_writes = 0
+            
+            cutoff = (datetime.now() - timedelta(days=days)).isoformat()
+            
+            # Readings saved one file each, before the JSONL log existed
+            legacy_records = []
+            for path in sorted(self._legacy_reading_paths(days)):
+                try:
+                    with open(path, 'rb') as lf:
+                        legacy_records.append(lf.read())
+                except OSError as e:
+                    self.logger.warning("Skipping unreadable soil reading %s: %s", path, e)
+            
+            count = 0
+            with open(self._jsonl_path, 'rb') as f:
+                size = os.fstat(f.fileno()).st_size
+                capacity = size // _MIN_READING_BYTES + len(legacy_records) + 1
+                timestamps = np.empty(capacity, dtype=object)
+                values = np.empty((len(self._params), capacity), dtype=np.float64)
+                
+                # Scan the log through a read-only mapping (empty files can't be mapped)
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+                try:
+                    lines = iter(mm.readline, b"") if mm is not None else ()
+                    log_records = (line for line in lines if line.strip())
+                    for record in itertools.chain(legacy_records, log_records):
+                        # Skip malformed or partial records (e.g. a line cut
+                        # short by a crash) rather than losing the whole history
+                        try:
+                            reading = orjson.loads(record)
+                            timestamp = reading["timestamp"]
+                            if timestamp < cutoff:
+                                continue
+                            row = [float(reading[p]) for p in self._params]
+                        except (KeyError, TypeError, ValueError) as e:
+                            self.logger.warning("Skipping malformed soil reading: %s", e)
+                            continue
+                        
+                        # Grow the columns if the size estimate was too small
+                        if count == capacity:
+                            capacity *= 2
+                            timestamps = np.concatenate([timestamps, np.empty_like(timestamps)])
+                            values = np.concatenate([values, np.empty_like(values)], axis=1)
+                        
+                        timestamps[count] = timestamp
+                        values[:, count] = row
+                        count += 1
+                finally:
+                    if mm is not None:
+                        mm.close()
+            
+            frame = {"timestamp": timestamps[:count]}
+            for i, param in enumerate(self._params):
+                frame[param] = values[i, :count].copy()
+            return frame
         except Exception as e:
-            self.logger.error(f"Error retrieving historical data: {str(e)}")
-            return []
+            self.logger.error("Error retrieving historical data: %s", e)
+            frame = {"timestamp": np.empty(0, dtype=object)}
+            for param in self._params:
+                frame[param] = np.empty(0, dtype=np.float64)
+            return frame
+    
+    def _terminate_partial_record(self):
+        """End a record left unterminated by a crash so new readings start on their own line"""
+        with open(self._jsonl_path, 'rb') as f:
+            if f.seek(0, os.SEEK_END) == 0:
+                return
+            f.seek(-1, os.SEEK_END)
+            last_byte = f.read(1)
+        if last_byte != b"\n":
+            self._jsonl.write(b"\n")
+            self._jsonl.flush()
+    
+    def _legacy_reading_paths(self, days):
+        """List per-file soil readings modified within the last `days` days"""
+        cutoff = time.time() - days * 86400
+        with os.scandir(self.data_path) as entries:
+            return [
+                entry.path for entry in entries
+                if entry.name.startswith("soil_reading_") and entry.name.endswith(".json")
+                and entry.stat().st_mtime >= cutoff
+            ]
+    
+    def close(self):
+        """Flush buffered readings and close the readings log"""
+        if not self._jsonl.closed:
+            self._jsonl.flush()
+            self._jsonl.close()
+        atexit.unregister(self.close)
 
 if __name__ == "__main__":
     # Test soil analyzer
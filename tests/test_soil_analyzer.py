@@ -0,0 +1,114 @@
+import json
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+import soil_analyzer
+from soil_analyzer import SoilAnalyzer
+
+
+def make_reading(timestamp, value=50.0):
+    return {
+        "timestamp": timestamp.isoformat(),
+        "moisture": value,
+        "ph": 6.5,
+        "nitrogen": 60.0,
+        "phosphorus": 45.0,
+        "potassium": 50.0,
+        "temperature": 25.0
+    }
+
+
+@pytest.fixture
+def analyzer(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    analyzer = SoilAnalyzer()
+    yield analyzer
+    analyzer.close()
+
+
+def test_historical_data_round_trip(analyzer):
+    readings = [make_reading(datetime.now(), value) for value in (31.5, 42.25, 55.0)]
+    for reading in readings:
+        analyzer._save_reading(reading)
+
+    assert analyzer.get_historical_data() == readings
+
+
+def test_historical_frame_applies_days_cutoff(analyzer):
+    now = datetime.now()
+    analyzer._save_reading(make_reading(now - timedelta(days=10), 30.0))
+    analyzer._save_reading(make_reading(now - timedelta(days=2), 40.0))
+    analyzer._save_reading(make_reading(now, 50.0))
+
+    assert analyzer.get_historical_frame(days=7)["moisture"].tolist() == [40.0, 50.0]
+    assert analyzer.get_historical_frame(days=30)["moisture"].tolist() == [30.0, 40.0, 50.0]
+
+
+def test_historical_frame_merges_legacy_files(analyzer):
+    legacy = make_reading(datetime.now() - timedelta(hours=1), 35.0)
+    with open(analyzer.data_path / "soil_reading_20260101_000000.json", "w") as f:
+        json.dump(legacy, f, indent=4)
+
+    stale = make_reading(datetime.now(), 99.0)
+    stale_path = analyzer.data_path / "soil_reading_20200101_000000.json"
+    with open(stale_path, "w") as f:
+        json.dump(stale, f, indent=4)
+    os.utime(stale_path, (0, 0))
+
+    analyzer._save_reading(make_reading(datetime.now(), 45.0))
+
+    frame = analyzer.get_historical_frame()
+    assert frame["moisture"].tolist() == [35.0, 45.0]
+    assert frame["timestamp"][0] == legacy["timestamp"]
+
+
+def test_historical_frame_skips_malformed_lines(analyzer):
+    analyzer._save_reading(make_reading(datetime.now(), 40.0))
+    analyzer._jsonl.write(b'{"timestamp": "2026-\n')
+    analyzer._jsonl.write(b'{"moisture": 12.0}\n')
+    analyzer._save_reading(make_reading(datetime.now(), 50.0))
+
+    assert analyzer.get_historical_frame()["moisture"].tolist() == [40.0, 50.0]
+
+
+def test_reading_after_truncated_record_survives_restart(analyzer):
+    analyzer._save_reading(make_reading(datetime.now(), 40.0))
+    analyzer.close()
+
+    # Simulate a crash partway through writing a record
+    with open(analyzer._jsonl_path, "ab") as f:
+        f.write(b'{"timestamp": "2026-10')
+
+    restarted = SoilAnalyzer()
+    try:
+        restarted._save_reading(make_reading(datetime.now(), 50.0))
+        restarted._save_reading(make_reading(datetime.now(), 60.0))
+        assert restarted.get_historical_frame()["moisture"].tolist() == [40.0, 50.0, 60.0]
+    finally:
+        restarted.close()
+
+
+def test_historical_frame_grows_past_size_estimate(analyzer, monkeypatch):
+    monkeypatch.setattr(soil_analyzer, "_MIN_READING_BYTES", 10 ** 6)
+    values = [float(v) for v in range(20, 45)]
+    for value in values:
+        analyzer._save_reading(make_reading(datetime.now(), value))
+
+    frame = analyzer.get_historical_frame()
+    assert frame["moisture"].dtype == np.float64
+    assert frame["moisture"].tolist() == values
+    assert len(frame["timestamp"]) == len(values)
+
+
+def test_save_reading_accepts_numpy_scalars(analyzer):
+    reading = make_reading(datetime.now())
+    reading["moisture"] = np.float64(41.5)
+    reading["nitrogen"] = np.int64(60)
+    analyzer._save_reading(reading)
+
+    saved = analyzer.get_historical_data()
+    assert saved[0]["moisture"] == 41.5
+    assert saved[0]["nitrogen"] == 60.0
@@ -0,0 +1,43 @@
+import threading
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+if NUMBA_AVAILABLE:
+    def _veg_stats_impl(hsv, h_lo, h_hi, s_lo, v_lo):
+        rows, cols = hsv.shape[0], hsv.shape[1]
+        count = 0
+        sat_sum = 0
+        for r in prange(rows):
+            for c in range(cols):
+                h = hsv[r, c, 0]
+                s = hsv[r, c, 1]
+                v = hsv[r, c, 2]
+                if h >= h_lo and h <= h_hi and s >= s_lo and v >= v_lo:
+                    count += 1
+                    sat_sum += np.int64(s)
+        return count, sat_sum, rows * cols
+
+    # Row-parallel kernel for single images, and a serial GIL-free kernel
+    # for worker threads, which already run images in parallel
+    _veg_stats_parallel = njit(parallel=True, fastmath=True)(_veg_stats_impl)
+    _veg_stats_serial = njit(nogil=True, fastmath=True)(_veg_stats_impl)
+
+    def veg_stats(hsv, h_lo, h_hi, s_lo, v_lo):
+        """
+        Threshold vegetation and accumulate its statistics in one pass
+        Args:
+            hsv: HSV image as a (height, width, 3) uint8 array
+            h_lo, h_hi: Inclusive hue range for vegetation
+            s_lo, v_lo: Minimum saturation and value for vegetation
+        Returns:
+            Tuple of (vegetation pixel count, saturation sum, total pixels)
+        """
+        if threading.current_thread() is threading.main_thread():
+            return _veg_stats_parallel(hsv, h_lo, h_hi, s_lo, v_lo)
+        return _veg_stats_serial(hsv, h_lo, h_hi, s_lo, v_lo)
@@ -1,14 +1,32 @@
 import cv2
 import numpy as np
+from PIL import Image
+from concurrent.futures import ThreadPoolExecutor
+import os
 from pathlib import Path
 import logging
 from datetime import datetime
 
+try:
+    from . import _kernels
+except ImportError:
+    import _kernels
+
+# HSV range for green vegetation
+LOWER_GREEN = np.array([35, 30, 30])
+UPPER_GREEN = np.array([85, 255, 255])
+
 class ImageProcessor:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         self.cache_dir = Path("data/processed_images")
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Reusable CLAHE operator, built once instead of per call
+        self._clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
+        
+        # Worker pool for batch analysis, created on first use
+        self._executor = None
     
     def preprocess_image(self, image_path, target_size=(224, 224)):
         """
@@ -19,27 +37,71 @@ class ImageProcessor:
         Returns:
             Preprocessed image array or None if processing fails
         """
+        image = self.load_uint8(image_path, target_size)
+        if image is None:
+            return None
+        return self.to_model_input(image)
+    
+    def load_uint8(self, image_path, target_size=(224, 224)):
+        """
+        Load and resize an image for the analysis pipeline
+        Args:
+            image_path: Path to the image file
+            target_size: Desired output size (height, width)
+        Returns:
+            RGB uint8 image array or None if loading fails
+        """
         try:
-            # Read image
-            image = cv2.imread(str(image_path))
+            # Read image, letting the JPEG decoder downscale when it can
+            flag = self._read_flag(image_path, target_size)
+            image = cv2.imread(str(image_path), flag)
             if image is None:
                 raise ValueError(f"Could not read image: {image_path}")
             
             # Resize image
             image = cv2.resize(image, target_size)
             
-            # Convert to RGB
-            image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-            
-            # Normalize pixel values
-            image = image.astype(np.float32) / 255.0
+            # Convert to RGB in place
+            cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=image)
             
             return image
             
         except Exception as e:
-            self.logger.error(f"Error preprocessing image: {str(e)}")
+            self.logger.error("Error preprocessing image: %s", e)
             return None
     
+    def _read_flag(self, image_path, target_size):
+        """
+        Pick the largest decode-time reduction that still covers target_size
+        Args:
+            image_path: Path to the image file
+            target_size: Desired output size (width, height as passed to cv2.resize)
+        Returns:
+            cv2.imread flag
+        """
+        try:
+            # Only the header is parsed here; pixel data is left undecoded
+            with Image.open(image_path) as header:
+                width, height = header.size
+        except Exception:
+            return cv2.IMREAD_COLOR
+        
+        for factor, flag in ((4, cv2.IMREAD_REDUCED_COLOR_4), (2, cv2.IMREAD_REDUCED_COLOR_2)):
+            if width // factor >= target_size[0] and height // factor >= target_size[1]:
+                return flag
+        return cv2.IMREAD_COLOR
+    
+    def to_model_input(self, image_u8):
+        """
+        Convert a uint8 image to normalized ML model input
+        Args:
+            image_u8: RGB uint8 image array
+        Returns:
+            float32 image array with values in [0, 1]
+        """
+        # Normalize pixel values, converting and scaling in one pass
+        return np.multiply(image_u8, np.float32(1.0 / 255.0), dtype=np.float32)
+    
     def enhance_image(self, image_array):
         """
         Enhance image quality
@@ -47,6 +109,9 @@ class ImageProcessor:
             image_array: Input image as numpy array
         Returns:
             Enhanced image array
+        Note:
+            Uses the CLAHE instance shared by this processor, which is not
+            thread-safe; use one ImageProcessor per thread.
         """
         try:
             # Convert to uint8 if normalized
@@ -55,21 +120,19 @@ class ImageProcessor:
             
             # Apply enhancements
             # 1. Contrast Limited Adaptive Histogram Equalization
-            clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
-            lab = cv2.cvtColor(image_array, cv2.COLOR_RGB2LAB)
-            lab[:,:,0] = clahe.apply(lab[:,:,0])
-            enhanced = cv2.cvtColor(lab, cv2.COLOR_LAB2RGB)
+            # (applied to the luma channel of YCrCb, a cheap linear transform)
+            ycrcb = cv2.cvtColor(image_array, cv2.COLOR_RGB2YCrCb)
+            ycrcb[:,:,0] = self._clahe.apply(ycrcb[:,:,0])
+            enhanced = cv2.cvtColor(ycrcb, cv2.COLOR_YCrCb2RGB)
             
-            # 2. Slight sharpening
-            kernel = np.array([[-1,-1,-1],
-                             [-1, 9,-1],
-                             [-1,-1,-1]]) / 9.0
-            enhanced = cv2.filter2D(enhanced, -1, kernel)
+            # 2. Slight sharpening (unsharp mask with a separable Gaussian)
+            blur = cv2.GaussianBlur(enhanced, (0, 0), sigmaX=1.0)
+            enhanced = cv2.addWeighted(enhanced, 1.5, blur, -0.5, 0)
             
             return enhanced
             
         except Exception as e:
-            self.logger.error(f"Error enhancing image: {str(e)}")
+            self.logger.error("Error enhancing image: %s", e)
             return image_array
     
     def detect_vegetation(self, image_array):
@@ -84,19 +147,23 @@ class ImageProcessor:
             # Convert to HSV color space
             hsv = cv2.cvtColor(image_array, cv2.COLOR_RGB2HSV)
             
-            # Define green color range
-            lower_green = np.array([35, 30, 30])
-            upper_green = np.array([85, 255, 255])
-            
-            # Create mask for green vegetation
-            mask = cv2.inRange(hsv, lower_green, upper_green)
-            
-            return mask
+            return self._vegetation_mask_from_hsv(hsv)
             
         except Exception as e:
-            self.logger.error(f"Error detecting vegetation: {str(e)}")
+            self.logger.error("Error detecting vegetation: %s", e)
             return None
     
+    def _vegetation_mask_from_hsv(self, hsv):
+        """
+        Threshold an HSV image for green vegetation
+        Args:
+            hsv: Image already converted to HSV color space
+        Returns:
+            Mask of detected vegetation
+        """
+        # Create mask for green vegetation
+        return cv2.inRange(hsv, LOWER_GREEN, UPPER_GREEN)
+    
     def analyze_plant_health(self, image_array):
         """
         Analyze plant health using color analysis
@@ -109,15 +176,24 @@ class ImageProcessor:
             # Convert to HSV for better color analysis
             hsv = cv2.cvtColor(image_array, cv2.COLOR_RGB2HSV)
             
-            # Get vegetation mask
-            veg_mask = self.detect_vegetation(image_array)
-            if veg_mask is None:
-                raise ValueError("Failed to create vegetation mask")
-            
             # Calculate metrics only for vegetation areas
+            if _kernels.NUMBA_AVAILABLE:
+                # Threshold, count and saturation sum fused into one pass
+                count, sat_sum, total = _kernels.veg_stats(
+                    hsv, int(LOWER_GREEN[0]), int(UPPER_GREEN[0]),
+                    int(LOWER_GREEN[1]), int(LOWER_GREEN[2])
+                )
+                coverage = (count / total) * 100
+                saturation = sat_sum / count if count else 0.0
+            else:
+                # Get vegetation mask, reusing the HSV conversion above
+                veg_mask = self._vegetation_mask_from_hsv(hsv)
+                coverage = (cv2.countNonZero(veg_mask) / (veg_mask.shape[0] * veg_mask.shape[1])) * 100
+                saturation = cv2.mean(hsv[:,:,1], mask=veg_mask)[0]
+            
             metrics = {
-                "vegetation_coverage": (np.sum(veg_mask > 0) / veg_mask.size) * 100,
-                "average_saturation": np.mean(hsv[:,:,1][veg_mask > 0]),
+                "vegetation_coverage": coverage,
+                "average_saturation": saturation,
                 "health_score": 0.0
             }
             
@@ -131,8 +207,41 @@ class ImageProcessor:
             return metrics
             
         except Exception as e:
-            self.logger.error(f"Error analyzing plant health: {str(e)}")
+            self.logger.error("Error analyzing plant health: %s", e)
+            return None
+    
+    def analyze_batch(self, image_paths, target_size=(224, 224)):
+        """
+        Analyze plant health for several images in parallel
+        Args:
+            image_paths: Iterable of image file paths
+            target_size: Desired analysis size (height, width)
+        Returns:
+            List of health metrics dictionaries (None for failed images),
+            in the same order as image_paths
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=os.cpu_count())
+        
+        # OpenCV releases the GIL, so images are processed concurrently
+        futures = [
+            self._executor.submit(self._analyze_path, path, target_size)
+            for path in image_paths
+        ]
+        return [future.result() for future in futures]
+    
+    def _analyze_path(self, image_path, target_size):
+        """Load a single image and analyze its plant health"""
+        image = self.load_uint8(image_path, target_size)
+        if image is None:
             return None
+        return self.analyze_plant_health(image)
+    
+    def close(self):
+        """Shut down the batch analysis worker pool"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
     
     def save_processed_image(self, image_array, prefix="processed"):
         """
@@ -154,12 +263,12 @@ class ImageProcessor:
             
             # Save image
             cv2.imwrite(str(filepath), image_array)
-            self.logger.info(f"Saved processed image to {filepath}")
+            self.logger.info("Saved processed image to %s", filepath)
             
             return filepath
             
         except Exception as e:
-            self.logger.error(f"Error saving processed image: {str(e)}")
+            self.logger.error("Error saving processed image: %s", e)
             return None
 
 if __name__ == "__main__":
@@ -169,8 +278,8 @@ if __name__ == "__main__":
     # Test with a sample image if available
     test_image_path = Path("data/test_image.jpg")
     if test_image_path.exists():
-        # Process image
-        processed = processor.preprocess_image(test_image_path)
+        # Load image, staying in uint8 for the analysis pipeline
+        processed = processor.load_uint8(test_image_path)
         if processed is not None:
             # Enhance image
             enhanced = processor.enhance_image(processed)